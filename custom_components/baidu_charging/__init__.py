@@ -1,3 +1,5 @@
+import json
+import time
 import logging
 import aiohttp
 import voluptuous as vol
@@ -10,14 +12,21 @@ from homeassistant.const import (
     CONF_API_KEY,
     CONF_SCAN_INTERVAL,
     STATE_IDLE,
+    STATE_UNKNOWN,
+    STATE_UNAVAILABLE,
 )
-from homeassistant.config_entries import ConfigEntry
+from homeassistant.config_entries import ConfigEntry, SOURCE_IMPORT
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, CoordinatorEntity
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
 import homeassistant.helpers.config_validation as cv
 
 from .converters.base import *
+from .profiler import SpanTimer, RefreshProfiler
+from .scheduler import RequestScheduler, DEFAULT_BUDGET
+from .station_index import async_get_index
+from .aggregate import AggregateRegistry, get_district, STAT_KEYS
+from .aggregator import ResponseCache, AggregatorView, CACHED_APIS, DEFAULT_TTL
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -26,16 +35,61 @@ TITLE = '充电站'
 DEFAULT_INTERVAL = '120'
 API_BASE = 'https://charging.map.baidu.com/charge_service'
 CONF_POI_UID = 'poi_uid'
+CONF_PRIORITY = 'priority'
+CONF_REQUEST_BUDGET = 'request_budget'
+CONF_TAGS = 'tags'
+CONF_HUB = 'hub'
+CONF_API_BASE = 'api_base'
+CONF_API_TOKEN = 'api_token'
+CONF_AGGREGATOR = 'aggregator'
+CONF_AGGREGATOR_TTL = 'aggregator_ttl'
+PREFETCH_TTL = 120  # seconds a config flow prefetch may seed the first refresh
 USER_AGENT = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0'
 
+EVENT_CONNECTOR_TRANSITION = f'{DOMAIN}_connector_transition'
+EVENT_STATION_AVAILABLE = f'{DOMAIN}_station_available'
+EVENT_STATION_FULL = f'{DOMAIN}_station_full'
+TRANSITION_POLLS = 2  # consecutive refreshes a new connector status must be seen on before firing
+
+CONNECTOR_STATUS = {
+    0: 'fault',
+    1: STATE_IDLE,
+    2: 'occupied',
+}
+
 SUPPORTED_PLATFORMS = [
     Platform.BUTTON,
     Platform.BINARY_SENSOR,
     Platform.SENSOR,
 ]
 
+CONFIG_SCHEMA = vol.Schema({
+    vol.Optional(DOMAIN): vol.Schema({
+        vol.Optional(CONF_REQUEST_BUDGET, default=DEFAULT_BUDGET): cv.positive_int,
+        vol.Optional(CONF_AGGREGATOR, default=False): cv.boolean,
+        vol.Optional(CONF_AGGREGATOR_TTL, default=DEFAULT_TTL): cv.positive_int,
+    }, extra=vol.ALLOW_EXTRA),
+}, extra=vol.ALLOW_EXTRA)
+
 
 async def async_setup(hass: HomeAssistant, hass_config):
+    config = hass_config.get(DOMAIN) or {}
+    hass.data.setdefault(DOMAIN, {})
+    hass.data[DOMAIN]['scheduler'] = RequestScheduler(hass, config.get(CONF_REQUEST_BUDGET, DEFAULT_BUDGET))
+    hass.data[DOMAIN]['aggregates'] = AggregateRegistry(hass)
+    from . import websocket_api
+    hass.data[DOMAIN]['snapshots'] = websocket_api.SnapshotHub()
+    websocket_api.async_setup(hass)
+    if config.get(CONF_AGGREGATOR):
+        async def fetch(api, params):
+            return await StateCoordinator.async_request(hass, api, params=params, cached=False)
+        cache = ResponseCache(hass, fetch, config.get(CONF_AGGREGATOR_TTL, DEFAULT_TTL))
+        hass.data[DOMAIN]['aggregator'] = cache
+        if getattr(hass, 'http', None):
+            hass.http.register_view(AggregatorView(cache))
+        else:
+            _LOGGER.warning('Aggregator responses are only shared locally, http is not loaded')
+    await async_get_index(hass, DOMAIN)
 
     async def update_status(call: ServiceCall):
         uid = call.data.get(CONF_POI_UID) or call.data.get('uid')
@@ -46,27 +100,74 @@ async def async_setup(hass: HomeAssistant, hass_config):
             coordinator = hass.data.get(entry.entry_id, {}).get('coordinator')
             if not coordinator:
                 continue
-            return await coordinator.async_update_station(uid)
+            return await coordinator.async_manual_update(uid)
         if uid:
-            return await StateCoordinator.async_get_station(hass, uid)
+            hass.data[DOMAIN]['scheduler'].charge()
+            return await StateCoordinator.async_get_station(hass, uid, cached=False)
         return {'error': 'Entry not found'}
     hass.services.async_register(
         DOMAIN, 'update_status', update_status,
         schema=vol.Schema({}, extra=vol.ALLOW_EXTRA),
         supports_response=SupportsResponse.OPTIONAL,
     )
+
+    async def profile(call: ServiceCall):
+        uid = call.data.get(CONF_POI_UID) or call.data.get('uid')
+        cycles = call.data.get('cycles', 1)
+        for entry in hass.config_entries.async_entries(DOMAIN):
+            if uid and uid != entry.unique_id:
+                continue
+            coordinator = hass.data.get(entry.entry_id, {}).get('coordinator')
+            if not coordinator:
+                continue
+            path = None
+            if cycles and coordinator.profiler and coordinator.profiler.running:
+                return {'error': 'Profiler is running a cycle, try again later'}
+            if cycles:
+                path = hass.config.path(f'{DOMAIN}_{coordinator.poi_uid}_{int(time.time())}.prof')
+                coordinator.profiler = RefreshProfiler(cycles, path)
+            return {
+                'uid': coordinator.poi_uid,
+                'cycles': cycles,
+                'path': path,
+                'spans': coordinator.timer.as_dict(),
+            }
+        return {'error': 'Entry not found'}
+    def require_uid(data):
+        if data.get('cycles') and not (data.get(CONF_POI_UID) or data.get('uid')):
+            raise vol.Invalid('uid is required to arm the profiler')
+        return data
+    hass.services.async_register(
+        DOMAIN, 'profile', profile,
+        schema=vol.All(vol.Schema({
+            vol.Optional('uid'): cv.string,
+            vol.Optional('cycles', default=1): vol.All(vol.Coerce(int), vol.Range(min=0, max=100)),
+        }, extra=vol.ALLOW_EXTRA), require_uid),
+        supports_response=SupportsResponse.OPTIONAL,
+    )
     return True
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
     hass.data.setdefault(DOMAIN, {})
     hass.data.setdefault(entry.entry_id, {})
+    if entry.data.get(CONF_HUB):
+        await hass.config_entries.async_forward_entry_setups(entry, [Platform.SENSOR])
+        return True
+    if not any(e.data.get(CONF_HUB) for e in hass.config_entries.async_entries(DOMAIN)):
+        hass.async_create_task(hass.config_entries.flow.async_init(
+            DOMAIN, context={'source': SOURCE_IMPORT}, data={CONF_HUB: True},
+        ))
     hass.data[entry.entry_id].setdefault('entities', {})
     coordinator = StateCoordinator(hass, entry)
-    await coordinator.async_config_entry_first_refresh()
     hass.data[entry.entry_id]['coordinator'] = coordinator
-    hass.data[DOMAIN]['latest_apikey'] = coordinator.data.get(CONF_API_KEY)
+    if coordinator.api_key:
+        hass.data[DOMAIN]['latest_apikey'] = coordinator.api_key
 
+    # the first refresh waits for the shared budget, until then sensors keep their restored state
+    # and entities discovered from station data are added once it arrives
     await hass.config_entries.async_forward_entry_setups(entry, SUPPORTED_PLATFORMS)
+    hass.data[DOMAIN]['scheduler'].register(coordinator, coordinator.priority)
+    hass.data[DOMAIN]['snapshots'].add(coordinator)
     entry.async_on_unload(entry.add_update_listener(async_reload_entry))
 
     return True
@@ -75,7 +176,18 @@ async def async_reload_entry(hass: HomeAssistant, config_entry: ConfigEntry):
     await hass.config_entries.async_reload(config_entry.entry_id)
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry):
+    if entry.data.get(CONF_HUB):
+        await hass.config_entries.async_unload_platforms(entry, [Platform.SENSOR])
+        hass.data[DOMAIN]['aggregates'].detach()
+        hass.data.pop(entry.entry_id, None)
+        return True
     await hass.config_entries.async_unload_platforms(entry, SUPPORTED_PLATFORMS)
+    if scheduler := hass.data.get(DOMAIN, {}).get('scheduler'):
+        scheduler.unregister(entry.entry_id)
+    if aggregates := hass.data.get(DOMAIN, {}).get('aggregates'):
+        aggregates.remove(entry.entry_id)
+    if snapshots := hass.data.get(DOMAIN, {}).get('snapshots'):
+        snapshots.remove(hass.data.get(entry.entry_id, {}).get('coordinator'))
 
     coordinator = hass.data.get(entry.entry_id, {}).get('coordinator')
     if isinstance(coordinator, DataUpdateCoordinator):
@@ -84,6 +196,15 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry):
 
     return True
 
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry):
+    """Remove the region hub, and its group sensors, with the last station."""
+    entries = hass.config_entries.async_entries(DOMAIN)
+    if entry.data.get(CONF_HUB) or any(not e.data.get(CONF_HUB) for e in entries if e is not entry):
+        return
+    for hub in entries:
+        if hub.data.get(CONF_HUB):
+            hass.async_create_task(hass.config_entries.async_remove(hub.entry_id))
+
 
 class StateCoordinator(DataUpdateCoordinator):
     def __init__(self, hass: HomeAssistant, entry: ConfigEntry):
@@ -92,12 +213,17 @@ class StateCoordinator(DataUpdateCoordinator):
             hass,
             _LOGGER,
             name=f'{entry.entry_id}-coordinator',
-            update_interval=self.update_timedelta,
+            update_interval=None,  # refreshes are driven by RequestScheduler
         )
         self.data = {}
         self.stations = {}
         self.entities = {}
         self.converters = []
+        self.platforms = {}
+        self.connector_states = {}
+        self.pending_transitions = {}
+        self.timer = SpanTimer()
+        self.profiler = None
 
         from homeassistant.components.sensor import SensorStateClass
         self.add_converters(*[
@@ -132,6 +258,27 @@ class StateCoordinator(DataUpdateCoordinator):
         for conv in args:
             self.add_converter(conv)
 
+    @callback
+    def add_platform(self, domain, entity_class, async_add_entities):
+        self.platforms[domain] = (entity_class, async_add_entities)
+        return self.async_add_new_entities(domain)
+
+    @callback
+    def async_add_new_entities(self, *domains):
+        """Add entities for converters discovered after platform setup."""
+        attrs = []
+        for domain in domains or list(self.platforms):
+            entity_class, async_add_entities = self.platforms[domain]
+            entities = [
+                entity_class(self, conv)
+                for conv in self.converters
+                if not conv.parent and conv.domain == domain and conv.attr not in self.entities
+            ]
+            if entities:
+                async_add_entities(entities)
+            attrs.extend(e.attr for e in entities)
+        return attrs
+
     @property
     def poi_uid(self):
         return self.entry.data.get(CONF_POI_UID, '')
@@ -140,6 +287,20 @@ class StateCoordinator(DataUpdateCoordinator):
     def api_key(self):
         return self.entry.data.get(CONF_API_KEY, '')
 
+    @property
+    def api_base(self):
+        return self.entry.data.get(CONF_API_BASE) or None
+
+    @property
+    def api_headers(self):
+        if self.api_base and (token := self.entry.data.get(CONF_API_TOKEN)):
+            return {aiohttp.hdrs.AUTHORIZATION: f'Bearer {token}'}
+        return {}
+
+    @property
+    def priority(self):
+        return bool(self.entry.data.get(CONF_PRIORITY))
+
     @property
     def update_timedelta(self):
         val = self.entry.data.get(CONF_SCAN_INTERVAL) or DEFAULT_INTERVAL
@@ -162,14 +323,44 @@ class StateCoordinator(DataUpdateCoordinator):
     def addr(self):
         return self.basic_info.get('addr', '')
 
+    @property
+    def aggregate_groups(self):
+        tags = f'{self.entry.data.get(CONF_TAGS) or ""}'.replace('，', ',').split(',')
+        return [get_district(self.addr), *[t.strip() for t in tags]]
+
     async def _async_update_data(self):
+        if self.profiler and not self.profiler.start():
+            self.profiler = None
         await self.async_update_station()
         return self.data
 
-    async def async_update_station(self, uid=None):
+    @callback
+    def async_update_listeners(self) -> None:
+        with self.timer.span('listeners'):
+            super().async_update_listeners()
+        if self.profiler and self.profiler.running and self.profiler.stop():
+            profiler, self.profiler = self.profiler, None
+            self.hass.async_add_executor_job(profiler.dump)
+            _LOGGER.info('Refresh profile written to %s', profiler.path)
+
+    async def async_manual_update(self, uid=None):
+        """Refresh on user request, charged to the shared budget and never served from cache."""
+        if scheduler := self.hass.data.get(DOMAIN, {}).get('scheduler'):
+            scheduler.charge(self.entry.entry_id)
+        return await self.async_update_station(uid, cached=False)
+
+    async def async_update_station(self, uid=None, cached=True):
         if not uid:
             uid = self.poi_uid
-        result = await StateCoordinator.async_get_station(self.hass, uid)
+        with self.timer.span('update_station'):
+            return await self._async_update_station(uid, cached)
+
+    async def _async_update_station(self, uid, cached=True):
+        result = StateCoordinator.pop_prefetched(self.hass, uid) if cached else None
+        if not result:
+            result = await StateCoordinator.async_get_station(
+                self.hass, uid, timer=self.timer, base=self.api_base, headers=self.api_headers, cached=cached,
+            )
         data = result.get('data') or {}
         stat = data.get('charge_connector_stat') or {}
         data.update({
@@ -202,6 +393,7 @@ class StateCoordinator(DataUpdateCoordinator):
             ])
 
         idx = -1
+        seen = set()
         for dat in data.get('tp_list', []):
             idx += 1
             if not (station_id := dat.get('tp_id')):
@@ -212,21 +404,127 @@ class StateCoordinator(DataUpdateCoordinator):
             if not isinstance(station, ChargingStation):
                 station = ChargingStation(self, dat, idx)
                 self.stations[station_id] = station
-            await station.async_update_connectors(dat)
+            with self.timer.span('update_connectors'):
+                await station.async_update_connectors(dat, cached)
+            seen |= station.connector_ids
 
         self.data.update(data)
+        self.track_connectors(seen)
+        if snapshots := self.hass.data.get(DOMAIN, {}).get('snapshots'):
+            snapshots.publish(self)
+        self.async_add_new_entities()
+        if aggregates := self.hass.data.get(DOMAIN, {}).get('aggregates'):
+            aggregates.update(self.entry.entry_id, self.aggregate_groups, self.data)
         return data
 
+    def track_connectors(self, seen: set):
+        """Fire events for connector statuses seen on TRANSITION_POLLS consecutive refreshes."""
+        connectors = self.data.get('connectors') or {}
+        baseline = not self.connector_states
+        free_before = self.free_connectors
+        for cid in set(self.connector_states) - seen:
+            self.connector_states.pop(cid, None)
+            self.pending_transitions.pop(cid, None)
+        for cid in seen:
+            conn = connectors.get(cid) or {}
+            status = CONNECTOR_STATUS.get(conn.get('status'))
+            if cid not in self.connector_states:
+                self.connector_states[cid] = status
+                continue
+            if status == self.connector_states[cid]:
+                self.pending_transitions.pop(cid, None)
+                continue
+            pending, polls = self.pending_transitions.get(cid) or (None, 0)
+            polls = polls + 1 if pending == status else 1
+            if polls < TRANSITION_POLLS:
+                self.pending_transitions[cid] = (status, polls)
+                continue
+            self.pending_transitions.pop(cid, None)
+            old = self.connector_states[cid]
+            self.connector_states[cid] = status
+            self.hass.bus.async_fire(EVENT_CONNECTOR_TRANSITION, {
+                **self.event_data,
+                'connector_id': cid,
+                'connector_name': conn.get('connector_name'),
+                'entity_id': f'sensor.{self.entity_prefix}_connector_{cid[-6:]}',
+                'from_state': old,
+                'to_state': status,
+                'free': self.free_connectors,
+            })
+
+        free_after = self.free_connectors
+        if baseline:
+            return
+        if free_before == 0 and free_after > 0:
+            self.hass.bus.async_fire(EVENT_STATION_AVAILABLE, {**self.event_data, 'free': free_after})
+        elif free_before > 0 and free_after == 0:
+            self.hass.bus.async_fire(EVENT_STATION_FULL, {**self.event_data, 'free': free_after})
+
+    @property
+    def event_data(self):
+        return {
+            'entry_id': self.entry.entry_id,
+            'uid': self.poi_uid,
+            'station_name': self.station_name,
+        }
+
+    def station_snapshot(self):
+        """Compact flat view of prices, connector statuses and totals."""
+        stat = self.data.get('charge_connector_stat') or {}
+        snapshot = {k: stat.get(k) for k in STAT_KEYS}
+        snapshot['total_left'] = self.data.get('total_left')
+        for station_id, station in self.stations.items():
+            fees = station.data.get('current_charge_fee') or {}
+            snapshot[f'price.{station_id}'] = station.data.get('total_price')
+            snapshot[f'electric_price.{station_id}'] = fees.get('MarketElecPrice')
+            snapshot[f'service_price.{station_id}'] = fees.get('MarketServicePrice')
+        for cid, conn in (self.data.get('connectors') or {}).items():
+            snapshot[f'connector.{cid}'] = CONNECTOR_STATUS.get(conn.get('status'))
+        return snapshot
+
+    @property
+    def free_connectors(self):
+        return sum(1 for v in self.connector_states.values() if v == STATE_IDLE)
+
+    async def async_shutdown(self):
+        if self.profiler:
+            self.profiler.cancel()
+            self.profiler = None
+        await super().async_shutdown()
+
     @staticmethod
-    async def async_get_station(hass, uid):
-        return await StateCoordinator.async_request(hass, 'charge_station/get_charge_detail', params={
+    async def async_get_station(hass, uid, **kwargs):
+        result = await StateCoordinator.async_request(hass, 'charge_station/get_charge_detail', params={
             'uid': uid,
-        })
+        }, **kwargs)
+        info = (result.get('data') or {}).get('basic_info') or {}
+        if info and (index := hass.data.get(DOMAIN, {}).get('index')):
+            index.add(info.get('uid') or uid, info.get('name'), info.get('addr'))
+        return result
+
+    @staticmethod
+    def add_prefetched(hass, uid, result: dict, fetched: float):
+        """Keep a station detail fetched by config flow for the first refresh."""
+        prefetched = hass.data.setdefault(DOMAIN, {}).setdefault('prefetched', {})
+        prefetched[uid] = (fetched, result)
+
+    @staticmethod
+    def pop_prefetched(hass, uid):
+        prefetched = hass.data.get(DOMAIN, {}).get('prefetched') or {}
+        fetched, result = prefetched.pop(uid, (0, None))
+        if result and time.monotonic() - fetched < PREFETCH_TTL:
+            return result
+        return None
 
     @staticmethod
-    async def async_request(hass, api: str, **kwargs):
+    async def async_request(hass, api: str, timer: SpanTimer = None, base=None, cached=True, **kwargs):
+        cache = hass.data.get(DOMAIN, {}).get('aggregator') if cached and not base else None
+        if cache and api.strip('/') in CACHED_APIS:
+            result, _fetched, _age = await cache.async_get(api, kwargs.get('params') or {})
+            return result
+        timer = timer or SpanTimer()
         kwargs.setdefault('method', 'GET')
-        kwargs.setdefault('url', f'{API_BASE}/{api.lstrip("/")}')
+        kwargs.setdefault('url', f'{(base or API_BASE).rstrip("/")}/{api.lstrip("/")}')
         kwargs['params'] = {
             'sv': '19.0.0',
             'os': 'ios',
@@ -239,28 +537,34 @@ class StateCoordinator(DataUpdateCoordinator):
             aiohttp.hdrs.USER_AGENT: USER_AGENT,
             **kwargs.get('headers', {}),
         }
+        kwargs.setdefault('timeout', aiohttp.ClientTimeout(total=30))
         try:
-            res = await async_get_clientsession(hass).request(
-                **kwargs,
-                timeout=aiohttp.ClientTimeout(total=30),
-            )
+            with timer.span('network'):
+                res = await async_get_clientsession(hass).request(**kwargs)
+                body = await res.read()
+            with timer.span('json'):
+                result = json.loads(body or '{}') or {}
         except Exception as err:
             _LOGGER.error('Request %s error: %s', api, err)
             return {}
-        result = await res.json() or {}
+        if not isinstance(result, dict):
+            return {}
         logger = _LOGGER.info if result.get('data') else _LOGGER.warning
-        logger('Request %s result: %s', api, [result, kwargs])
+        # headers carry the aggregator token, keep them out of the log
+        params = {k: v for k, v in kwargs.items() if k != 'headers'}
+        logger('Request %s result: %s', api, [result, params])
         return result
 
     def decode(self, data: dict) -> dict:
         """Decode props for HASS."""
         payload = {}
-        for conv in self.converters:
-            prop = conv.prop or conv.attr
-            value = get_value(data, prop, None)
-            if prop is None:
-                continue
-            conv.decode(self, payload, value)
+        with self.timer.span('decode'):
+            for conv in self.converters:
+                prop = conv.prop or conv.attr
+                value = get_value(data, prop, None)
+                if prop is None:
+                    continue
+                conv.decode(self, payload, value)
         return payload
 
     def push_state(self, value: dict):
@@ -269,20 +573,22 @@ class StateCoordinator(DataUpdateCoordinator):
             return
         attrs = value.keys()
 
-        for entity in self.entities.values():
-            if not hasattr(entity, 'subscribed_attrs'):
-                continue
-            if not (entity.subscribed_attrs & attrs):
-                continue
-            entity.async_set_state(value)
-            if entity.added:
-                entity.async_write_ha_state()
+        with self.timer.span('push_state'):
+            for entity in self.entities.values():
+                if not hasattr(entity, 'subscribed_attrs'):
+                    continue
+                if not (entity.subscribed_attrs & attrs):
+                    continue
+                entity.async_set_state(value)
+                if entity.added:
+                    entity.async_write_ha_state()
 
     def subscribe_attrs(self, conv: Converter):
-        attrs = {conv.attr}
-        if conv.childs:
-            attrs |= set(conv.childs)
-        attrs.update(c.attr for c in self.converters if c.parent == conv.attr)
+        with self.timer.span('subscribe_attrs'):
+            attrs = {conv.attr}
+            if conv.childs:
+                attrs |= set(conv.childs)
+            attrs.update(c.attr for c in self.converters if c.parent == conv.attr)
         return attrs
 
 class ChargingStation:
@@ -290,6 +596,7 @@ class ChargingStation:
         self.coordinator = coordinator
         self.hass = coordinator.hass
         self.data = data
+        self.connector_ids = set()
 
         from homeassistant.components.sensor import SensorDeviceClass
         coordinator.add_converters(*[
@@ -316,16 +623,25 @@ class ChargingStation:
     def tp_code(self):
         return self.data.get('tp_code', 88)
 
-    async def async_update_connectors(self, station_data=None):
+    async def async_update_connectors(self, station_data=None, cached=True):
         result = await self.coordinator.async_request(self.hass, 'charge_station/get_connector_detail', params={
             'uid': self.coordinator.poi_uid,
             'station_id': self.station_id,
             'tp_code': self.tp_code,
-        })
+        }, timer=self.coordinator.timer, base=self.coordinator.api_base,
+            headers=self.coordinator.api_headers, cached=cached)
         data = result.get('data') or {}
 
         from homeassistant.components.binary_sensor import BinarySensorDeviceClass
         self.coordinator.data.setdefault('connectors', {})
+        if data:
+            # keep the last known connectors when the request fails
+            self.connector_ids = {
+                conn.get('connector_id')
+                for lst in [data.get('fast') or [], data.get('slow') or []]
+                for conn in lst
+                if conn.get('connector_id')
+            }
         for lst in [data.get('fast') or [], data.get('slow') or []]:
             for conn in lst:
                 cid = conn.get('connector_id')
@@ -336,11 +652,7 @@ class ChargingStation:
                 connectors[cid] = conn
                 attr = f'connector_{cid[-6:]}'
                 self.coordinator.add_converters(*[
-                    MapSensorConv(attr, prop=f'connectors.{cid}.status', map={
-                        0: 'fault',
-                        1: STATE_IDLE,
-                        2: 'occupied',
-                    }).with_option({
+                    MapSensorConv(attr, prop=f'connectors.{cid}.status', map=CONNECTOR_STATUS).with_option({
                         'name': conn.get('connector_name'),
                         'icon': 'mdi:power-plug',
                         'device_class': BinarySensorDeviceClass.PLUG,
@@ -407,7 +719,7 @@ class XEntity(CoordinatorEntity):
         await super().async_added_to_hass()
         if hasattr(self, 'async_get_last_state'):
             state: State = await self.async_get_last_state()
-            if state:
+            if state and state.state not in (STATE_UNKNOWN, STATE_UNAVAILABLE):
                 self.async_restore_last_state(state.state, state.attributes)
 
         self.added = True
@@ -433,6 +745,9 @@ class XEntity(CoordinatorEntity):
         _LOGGER.info('%s: State changed: %s', self.entity_id, data)
 
     def update(self):
+        if not self.coordinator.data:
+            # not refreshed yet, keep the restored state
+            return
         payload = self.coordinator.decode(self.coordinator.data)
         self.coordinator.push_state(payload)
 
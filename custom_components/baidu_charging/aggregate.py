@@ -0,0 +1,84 @@
+import re
+import logging
+
+from homeassistant.core import HomeAssistant
+
+_LOGGER = logging.getLogger(__name__)
+
+HUB_UID = 'aggregates'  # unique id of the config entry owning region sensors
+STAT_KEYS = [
+    'dc_left', 'dc_total', 'dc_occu', 'dc_fault',
+    'ac_left', 'ac_total', 'ac_occu', 'ac_fault',
+]
+
+
+def get_district(addr: str):
+    addr = f'{addr or ""}'.replace('自治区', '省')
+    if fls := re.findall(r'([^省市]{1,8}?(?:区|县|旗))', addr):
+        return fls[0]
+    if fls := re.findall(r'([^省]{1,8}?市)', addr):
+        return fls[0]
+    return None
+
+
+def get_contribution(data: dict):
+    stat = data.get('charge_connector_stat') or {}
+    res = {k: int(stat.get(k) or 0) for k in STAT_KEYS}
+    res['total_left'] = res['dc_left'] + res['ac_left']
+    res['stations'] = 1
+    return res
+
+
+class AggregateRegistry:
+    """Region totals maintained incrementally from each coordinator update."""
+
+    def __init__(self, hass: HomeAssistant):
+        self.hass = hass
+        self.groups = {}  # group -> totals
+        self.members = {}  # entry_id -> (groups, contribution)
+        self.entities = {}  # group -> entity
+        self.add_entities = None  # sensor platform callback of the hub entry
+
+    def attach(self, async_add_entities):
+        """Called by the hub entry's sensor platform, the only owner of group sensors."""
+        self.add_entities = async_add_entities
+        self._refresh(list(self.groups))
+
+    def detach(self):
+        self.add_entities = None
+        self.entities.clear()
+
+    def update(self, entry_id, groups, data: dict):
+        """Move one entry's contribution, touching only groups it belongs to."""
+        groups = frozenset(filter(None, groups))
+        contribution = get_contribution(data)
+        old_groups, old = self.members.get(entry_id) or (frozenset(), None)
+        if old_groups == groups and old == contribution:
+            return
+        self.members[entry_id] = (groups, contribution)
+        for group in old_groups:
+            self._apply(group, old, -1)
+        for group in groups:
+            self._apply(group, contribution, 1)
+        self._refresh(old_groups | groups)
+
+    def remove(self, entry_id):
+        old_groups, old = self.members.pop(entry_id, None) or (frozenset(), None)
+        for group in old_groups:
+            self._apply(group, old, -1)
+        self._refresh(old_groups)
+
+    def _apply(self, group, contribution, sign):
+        totals = self.groups.setdefault(group, {})
+        for k, v in contribution.items():
+            totals[k] = totals.get(k, 0) + v * sign
+
+    def _refresh(self, groups):
+        for group in groups:
+            if entity := self.entities.get(group):
+                if entity.hass:
+                    entity.async_write_ha_state()
+            elif self.add_entities and self.groups.get(group, {}).get('stations'):
+                from .sensor import AggregateSensorEntity
+                entity = self.entities[group] = AggregateSensorEntity(self, group)
+                self.add_entities([entity])
@@ -0,0 +1,108 @@
+import re
+import copy
+import time
+import asyncio
+import logging
+from email.utils import formatdate
+
+from aiohttp import web
+from homeassistant.core import HomeAssistant
+from homeassistant.components.http import HomeAssistantView
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_TTL = 60
+MAX_ITEMS = 1000
+CACHED_APIS = {  # api -> params forwarded upstream, all required
+    'charge_station/get_charge_detail': ['uid'],
+    'charge_station/get_connector_detail': ['uid', 'station_id', 'tp_code'],
+}
+PARAM_PATTERN = re.compile(r'[\w-]{1,64}')
+
+
+def filter_params(api, params: dict):
+    """Whitelisted params of a cached api, None if any is missing or malformed."""
+    res = {}
+    for k in CACHED_APIS.get(api.strip('/'), []):
+        val = f'{params.get(k, "")}'
+        if not PARAM_PATTERN.fullmatch(val):
+            return None
+        res[k] = val
+    return res
+
+
+class ResponseCache:
+    """Shared upstream responses, one in-flight request per station."""
+
+    def __init__(self, hass: HomeAssistant, fetch, ttl=DEFAULT_TTL):
+        self.hass = hass
+        self.fetch = fetch  # async (api, params) -> dict
+        self.ttl = ttl
+        self.items = {}  # key -> (monotonic, wall time, result)
+        self.pending = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(api, params: dict):
+        return api.strip('/'), tuple(sorted(params.items()))
+
+    async def async_get(self, api, params: dict):
+        """Return (result, fetched wall time, age in seconds), result is a copy callers may mutate."""
+        if (filtered := filter_params(api, params)) is None:
+            # malformed params are never cached
+            return await self.fetch(api, params), time.time(), 0
+        params = filtered
+        key = self.key(api, params)
+        if cached := self.items.get(key):
+            age = time.monotonic() - cached[0]
+            if age < self.ttl:
+                self.hits += 1
+                return copy.deepcopy(cached[2]), cached[1], age
+        if not (task := self.pending.get(key)):
+            self.misses += 1
+            task = self.pending[key] = self.hass.async_create_task(self._async_fetch(key, api, params))
+        result, fetched, age = await asyncio.shield(task)
+        # the same dict is kept in the cache and shared by every waiter
+        return copy.deepcopy(result), fetched, age
+
+    async def _async_fetch(self, key, api, params):
+        try:
+            result = await self.fetch(api, params)
+        finally:
+            self.pending.pop(key, None)
+        now = time.monotonic(), time.time()
+        if result.get('data'):
+            self.items.pop(key, None)
+            self.evict(now[0])
+            self.items[key] = (*now, result)
+        return result, now[1], 0
+
+    def evict(self, now):
+        """Drop expired responses, then the oldest ones beyond MAX_ITEMS."""
+        for key in [k for k, v in self.items.items() if now - v[0] >= self.ttl]:
+            self.items.pop(key, None)
+        while len(self.items) >= MAX_ITEMS:
+            self.items.pop(next(iter(self.items)))
+
+
+class AggregatorView(HomeAssistantView):
+    """Serve cached charge_service responses to other authenticated instances."""
+
+    url = '/api/baidu_charging/charge_service/{api:.+}'
+    name = 'api:baidu_charging:charge_service'
+
+    def __init__(self, cache: ResponseCache):
+        self.cache = cache
+
+    async def get(self, request: web.Request, api: str):
+        if api.strip('/') not in CACHED_APIS:
+            return self.json_message('Unsupported api', 404)
+        if (params := filter_params(api, request.query)) is None:
+            return self.json_message('Invalid params', 400)
+        result, fetched, age = await self.cache.async_get(api, params)
+        return self.json(result, headers={
+            'Cache-Control': f'max-age={max(int(self.cache.ttl - age), 0)}',
+            'Age': f'{int(age)}',
+            'Last-Modified': formatdate(fetched, usegmt=True),
+        })
@@ -3,6 +3,7 @@ from __future__ import annotations
 import logging
 
 from homeassistant.core import callback
+from homeassistant.helpers.restore_state import RestoreEntity
 from homeassistant.const import STATE_ON
 from homeassistant.components.binary_sensor import (
     DOMAIN as ENTITY_DOMAIN,
@@ -15,17 +16,12 @@ _LOGGER = logging.getLogger(__name__)
 
 
 async def async_setup_entry(hass, entry, async_add_entities):
-    attrs = []
     coordinator = hass.data[entry.entry_id]['coordinator']
-    for conv in coordinator.converters:
-        if conv.parent or conv.domain != ENTITY_DOMAIN:
-            continue
-        attrs.append(conv.attr)
-        async_add_entities([BinarySensorEntity(coordinator, conv)])
+    attrs = coordinator.add_platform(ENTITY_DOMAIN, BinarySensorEntity, async_add_entities)
     _LOGGER.info('async_setup_entry: %s', [ENTITY_DOMAIN, attrs])
 
 
-class BinarySensorEntity(XEntity, BaseEntity):
+class BinarySensorEntity(XEntity, BaseEntity, RestoreEntity):
     @callback
     def async_set_state(self, data: dict):
         super().async_set_state(data)
@@ -12,13 +12,8 @@ _LOGGER = logging.getLogger(__name__)
 
 
 async def async_setup_entry(hass, entry, async_add_entities):
-    attrs = []
     coordinator = hass.data[entry.entry_id]['coordinator']
-    for conv in coordinator.converters:
-        if conv.parent or conv.domain != ENTITY_DOMAIN:
-            continue
-        attrs.append(conv.attr)
-        async_add_entities([ButtonEntity(coordinator, conv)])
+    attrs = coordinator.add_platform(ENTITY_DOMAIN, ButtonEntity, async_add_entities)
     _LOGGER.info('async_setup_entry: %s', [ENTITY_DOMAIN, attrs])
 
 class ButtonEntity(XEntity, BaseEntity):
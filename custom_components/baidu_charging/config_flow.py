@@ -1,3 +1,5 @@
+import time
+import asyncio
 import logging
 import aiohttp
 import json
@@ -8,37 +10,76 @@ from homeassistant.helpers.aiohttp_client import async_get_clientsession
 from . import (
     DOMAIN,
     StateCoordinator, callback, cv,
-    TITLE, DEFAULT_INTERVAL,
-    CONF_NAME, CONF_API_KEY, CONF_POI_UID, CONF_SCAN_INTERVAL,
+    TITLE, DEFAULT_INTERVAL, PREFETCH_TTL,
+    CONF_NAME, CONF_API_KEY, CONF_POI_UID, CONF_SCAN_INTERVAL, CONF_PRIORITY, CONF_TAGS, CONF_API_BASE, CONF_API_TOKEN, CONF_HUB,
 )
+from .aggregate import HUB_UID
+from .station_index import async_get_index
 
 _LOGGER = logging.getLogger(__name__)
 CONF_REGION = 'region'
 CONF_SEARCH = 'search'
+SEARCH_ONLINE = '__online__'
+PREFETCH_LIMIT = 10
+PREFETCH_CONCURRENCY = 5
+PREFETCH_TIMEOUT = 5
 
 
 class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     CONNECTION_CLASS = config_entries.CONN_CLASS_CLOUD_POLL
 
+    def __init__(self):
+        self.prefetched = {}
+
     @staticmethod
     @callback
     def async_get_options_flow(entry: config_entries.ConfigEntry):
         return OptionsFlowHandler(entry)
 
+    @classmethod
+    @callback
+    def async_supports_options_flow(cls, entry: config_entries.ConfigEntry):
+        return not entry.data.get(CONF_HUB)
+
+    async def async_step_import(self, user_input=None):
+        """Create the hub entry owning region sensors, started by the first station."""
+        await self.async_set_unique_id(HUB_UID)
+        self._abort_if_unique_id_configured()
+        return self.async_create_entry(title='区域统计', data={CONF_HUB: True})
+
     async def async_step_user(self, user_input=None):
         self.hass.data.setdefault(DOMAIN, {})
         if user_input is None:
             user_input = {}
         schema = {}
         errors = {}
-        apikey = user_input.get(CONF_API_KEY) or ''
+        apikey = user_input.get(CONF_API_KEY) or self.hass.data[DOMAIN].get('latest_apikey') or ''
         search = user_input.get(CONF_SEARCH)
         region = user_input.get(CONF_REGION)
         poi_uid = user_input.get(CONF_POI_UID, '')
+        online = poi_uid == SEARCH_ONLINE
+        if online:
+            poi_uid = ''
+        index = await async_get_index(self.hass, DOMAIN)
+        is_link = search and re.search(r'baidu\.com|uid(?:%3D|=)', search)
 
         if poi_uid:
             pass
 
+        elif search and not is_link and not online and (found := index.search(search)):
+            results = {
+                '': '重新搜索',
+                **{
+                    uid: self.choice_label(uid, ' '.join(filter(None, [v.get('name'), v.get('addr')])))
+                    for uid, v in found.items()
+                },
+                SEARCH_ONLINE: '在线搜索',
+            }
+            schema.update({
+                vol.Optional(CONF_POI_UID, default=''): vol.In(results),
+            })
+            self.context['tip'] = f'从本地记录中找到{len(found)}个与【{search}】相关的充电站'
+
         elif search and apikey:
             msg = ''
             api = 'https://api.map.baidu.com/place/v2/search'
@@ -58,6 +99,8 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                     v.get('uid'): v.get('name')
                     for v in data.get('results') or []
                 }
+                for v in data.get('results') or []:
+                    index.add(v.get('uid'), v.get('name'), v.get('address'))
                 if not results:
                     msg = data.get('message', '')
             except Exception as err:
@@ -67,9 +110,13 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             if results:
                 if poi_uid not in results:
                     poi_uid = ''
+                await self.async_prefetch(results)
                 results = {
                     '': '重新搜索',
-                    **results,
+                    **{
+                        uid: self.choice_label(uid, name)
+                        for uid, name in results.items()
+                    },
                 }
                 schema.update({
                     vol.Optional(CONF_POI_UID, default=poi_uid): vol.In(results),
@@ -77,20 +124,38 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             else:
                 self.context['tip'] = f'未找到与【{search}】相关的结果\n{msg}'
 
+        elif search and online:
+            schema.update({
+                vol.Optional(CONF_POI_UID, default=SEARCH_ONLINE): vol.In({
+                    '': '重新搜索',
+                    SEARCH_ONLINE: '在线搜索',
+                }),
+                vol.Required(CONF_API_KEY, default=apikey): str,
+            })
+            self.context['tip'] = '在线搜索需要填写百度地图AK'
+
         elif search:
             if '/j.map.baidu.com/' in search:
-                res = await async_get_clientsession(self.hass).get(search.strip(), allow_redirects=False)
-                if url := res.headers.get(aiohttp.hdrs.LOCATION):
+                link = search.strip()
+                if url := index.links.get(link):
                     search = url
                 else:
-                    _LOGGER.warning('async_step_user %s', [url, res.headers, user_input])
+                    res = await async_get_clientsession(self.hass).get(link, allow_redirects=False)
+                    if url := res.headers.get(aiohttp.hdrs.LOCATION):
+                        index.add_link(link, url)
+                        search = url
+                    else:
+                        _LOGGER.warning('async_step_user %s', [url, res.headers, user_input])
             if fls := re.findall(r'uid(?:%3D|=)(\w{16,})', search):
                 poi_uid = fls[0]
             else:
                 self.context['tip'] = f'分享链接不正确\n{search}'
 
         if poi_uid:
-            result = await StateCoordinator.async_get_station(self.hass, poi_uid)
+            fetched, result = self.prefetched.get(poi_uid) or (0, {})
+            if not result.get('data') or time.monotonic() - fetched >= PREFETCH_TTL:
+                fetched = time.monotonic()
+                result = await StateCoordinator.async_get_station(self.hass, poi_uid)
             data = result.get('data') or {}
             basic_info = data.get('basic_info')
             if not basic_info:
@@ -103,6 +168,7 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 user_input.pop(CONF_SEARCH, None)
                 user_input[CONF_POI_UID] = poi_uid
                 user_input[CONF_NAME] = basic_info.get('name', '')
+                StateCoordinator.add_prefetched(self.hass, poi_uid, result, fetched)
                 return self.async_create_entry(
                     title=user_input.get(CONF_NAME) or TITLE,
                     data=user_input,
@@ -126,6 +192,46 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             description_placeholders={'tip': self.context.pop('tip', '')},
         )
 
+    async def async_prefetch(self, uids):
+        """Fetch charge details of candidates concurrently for the picker."""
+        semaphore = asyncio.Semaphore(PREFETCH_CONCURRENCY)
+        timeout = aiohttp.ClientTimeout(total=PREFETCH_TIMEOUT)
+
+        async def fetch(uid):
+            async with semaphore:
+                try:
+                    result = await StateCoordinator.async_get_station(self.hass, uid, timeout=timeout)
+                except Exception as exc:
+                    # a failed preview only leaves that choice unannotated
+                    _LOGGER.warning('Prefetch %s error: %s', uid, exc)
+                    result = {}
+                self.prefetched[uid] = (time.monotonic(), result)
+
+        uids = [u for u in uids if u and u not in self.prefetched][:PREFETCH_LIMIT]
+        if scheduler := self.hass.data[DOMAIN].get('scheduler'):
+            for _uid in uids:
+                scheduler.charge()
+        await asyncio.gather(*[fetch(u) for u in uids])
+
+    def choice_label(self, uid, name):
+        _fetched, result = self.prefetched.get(uid) or (0, {})
+        data = result.get('data') or {}
+        if not data:
+            # local results are labelled from stations already monitored, without requests
+            for entry in self.hass.config_entries.async_entries(DOMAIN):
+                coordinator = self.hass.data.get(entry.entry_id, {}).get('coordinator')
+                if coordinator and entry.unique_id == uid:
+                    data = coordinator.data or {}
+        stat = data.get('charge_connector_stat') or {}
+        info = []
+        if stat.get('dc_total'):
+            info.append(f'快充 {stat.get("dc_left", 0)}/{stat["dc_total"]}')
+        if stat.get('ac_total'):
+            info.append(f'慢充 {stat.get("ac_left", 0)}/{stat["ac_total"]}')
+        if data and not info:
+            info.append('无充电桩信息')
+        return f'{name} ({" ".join(info)})' if info else name
+
 
 class OptionsFlowHandler(config_entries.OptionsFlow):
     def __init__(self, config_entry: config_entries.ConfigEntry):
@@ -139,6 +245,8 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
         if user_input:
             if not to_time_period(user_input.get(CONF_SCAN_INTERVAL)):
                 self.context['tip'] = '⚠️ 更新频率格式错误'
+            elif not re.match(r'^(https?://|$)', user_input.get(CONF_API_BASE) or ''):
+                self.context['tip'] = '⚠️ 接口地址格式错误'
             else:
                 self.hass.config_entries.async_update_entry(
                     self.config_entry, data={**self.config_entry.data, **user_input}
@@ -156,6 +264,10 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
             step_id='init',
             data_schema=vol.Schema({
                 vol.Optional(CONF_SCAN_INTERVAL, default=defaults.get(CONF_SCAN_INTERVAL, DEFAULT_INTERVAL)): str,
+                vol.Optional(CONF_PRIORITY, default=defaults.get(CONF_PRIORITY, False)): bool,
+                vol.Optional(CONF_TAGS, default=defaults.get(CONF_TAGS, '')): str,
+                vol.Optional(CONF_API_BASE, default=defaults.get(CONF_API_BASE, '')): str,
+                vol.Optional(CONF_API_TOKEN, default=defaults.get(CONF_API_TOKEN, '')): str,
             }),
             description_placeholders={'tip': self.context.pop('tip', '')},
         )
@@ -109,5 +109,5 @@ class UpdateButtonConv(Converter):
 
     def encode(self, client: "Client", payload: dict, value: Any):
         async def update(*args, **kwargs):
-            await client.async_update_station()
+            await client.async_manual_update()
         return update
@@ -0,0 +1,21 @@
+from __future__ import annotations
+
+from homeassistant.core import HomeAssistant
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.components.diagnostics import async_redact_data
+
+from . import DOMAIN, CONF_API_KEY, CONF_API_TOKEN
+
+TO_REDACT = {CONF_API_KEY, CONF_API_TOKEN}
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry):
+    scheduler = hass.data.get(DOMAIN, {}).get('scheduler')
+    coordinator = hass.data.get(entry.entry_id, {}).get('coordinator')
+    item = scheduler.entries.get(entry.entry_id) if scheduler else None
+    return {
+        'entry': async_redact_data(dict(entry.data), TO_REDACT),
+        'scheduler': scheduler.as_dict() if scheduler else None,
+        'schedule': item.as_dict() if item else None,
+        'spans': coordinator.timer.as_dict() if coordinator else None,
+    }
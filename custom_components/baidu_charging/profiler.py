@@ -0,0 +1,86 @@
+import time
+import cProfile
+import logging
+from contextlib import contextmanager
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class SpanTimer:
+    """Always-on accumulated timings for each stage of a refresh cycle."""
+
+    def __init__(self):
+        self.spans = {}
+
+    @contextmanager
+    def span(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def add(self, name, elapsed):
+        span = self.spans.get(name)
+        if span is None:
+            span = self.spans[name] = [0, 0.0, 0.0, 0.0]  # count, total, last, max
+        span[0] += 1
+        span[1] += elapsed
+        span[2] = elapsed
+        if elapsed > span[3]:
+            span[3] = elapsed
+
+    def as_dict(self):
+        return {
+            name: {
+                'count': count,
+                'total_ms': round(total * 1000, 3),
+                'avg_ms': round(total * 1000 / count, 3) if count else 0,
+                'last_ms': round(last * 1000, 3),
+                'max_ms': round(peak * 1000, 3),
+            }
+            for name, (count, total, last, peak) in self.spans.items()
+        }
+
+
+class RefreshProfiler:
+    """cProfile armed for the next N refresh cycles of one coordinator."""
+
+    def __init__(self, cycles: int, path: str):
+        self.cycles = max(int(cycles), 1)
+        self.path = path
+        self.done = 0
+        self.running = False
+        self.profile = cProfile.Profile()
+
+    def start(self):
+        """Start a cycle, return False when profiling is not possible."""
+        if self.running:
+            return True
+        try:
+            self.profile.enable()
+            self.running = True
+        except ValueError as exc:
+            # another profiler is already active on this interpreter
+            _LOGGER.warning('Profiler %s disarmed: %s', self.path, exc)
+            return False
+        return True
+
+    def stop(self):
+        """Stop the current cycle, return True once all cycles are collected."""
+        if self.running:
+            self.profile.disable()
+            self.running = False
+        self.done += 1
+        return self.done >= self.cycles
+
+    def cancel(self):
+        """Disarm without writing, removes the profile hook if a cycle is running."""
+        if self.running:
+            self.profile.disable()
+            self.running = False
+
+    def dump(self):
+        """Write aggregated stats, blocking, run in executor."""
+        self.profile.dump_stats(self.path)
+        return self.path
@@ -0,0 +1,147 @@
+import time
+import random
+import logging
+from datetime import timedelta
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_interval
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_BUDGET = 60  # upstream requests per minute across all entries
+BURST = 0.25  # bucket size in minutes, limits how many requests can fire at once
+PRIORITY_RESERVE = 0.3  # share of the bucket only priority entries may spend
+STARTUP_JITTER = 15  # seconds first refreshes are spread over before the budget applies
+TICK = timedelta(seconds=1)
+
+
+class ScheduledEntry:
+    def __init__(self, coordinator, priority=False):
+        self.coordinator = coordinator
+        self.priority = priority
+        self.due = 0.0
+        self.queued = None
+        self.running = False
+        self.last_run = None
+        self.achieved = None
+        self.runs = 0
+        self.manual = 0
+
+    @property
+    def interval(self):
+        return self.coordinator.update_timedelta.total_seconds()
+
+    @property
+    def cost(self):
+        # one get_charge_detail plus one get_connector_detail per operator
+        return 1 + max(len(self.coordinator.stations), 1)
+
+    def as_dict(self):
+        return {
+            'priority': self.priority,
+            'interval': self.interval,
+            'achieved_interval': round(self.achieved, 1) if self.achieved else None,
+            'due_in': round(self.due - time.monotonic(), 1),
+            'queued': self.queued is not None,
+            'running': self.running,
+            'cost': self.cost,
+            'runs': self.runs,
+            'manual_runs': self.manual,
+        }
+
+
+class RequestScheduler:
+    """Integration wide refresh scheduler with a shared request budget."""
+
+    def __init__(self, hass: HomeAssistant, budget=DEFAULT_BUDGET):
+        self.hass = hass
+        self.budget = budget
+        self.capacity = max(budget * BURST, 1)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.entries = {}
+        self.queue = []
+        self.manual_requests = 0
+        self._unsub = None
+
+    def refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.budget / 60)
+        self.updated = now
+
+    def take(self, cost, priority=False):
+        self.refill()
+        reserve = 0 if priority else self.capacity * PRIORITY_RESERVE
+        if self.tokens - cost < reserve and self.tokens < self.capacity:
+            return False
+        self.tokens -= cost
+        return True
+
+    def charge(self, entry_id=None):
+        """Account a user requested refresh, it runs now and may leave the bucket in debt."""
+        item = self.entries.get(entry_id)
+        cost = item.cost if item else 1
+        self.refill()
+        self.tokens -= cost
+        self.manual_requests += cost
+        if item:
+            item.manual += 1
+            item.due = time.monotonic() + item.interval * random.uniform(0.9, 1.1)
+
+    def register(self, coordinator, priority=False):
+        """Schedule an entry, its first refresh is also dispatched by the budget."""
+        item = ScheduledEntry(coordinator, priority)
+        item.due = time.monotonic() + random.uniform(0, STARTUP_JITTER)
+        self.entries[coordinator.entry.entry_id] = item
+        if not self._unsub:
+            self._unsub = async_track_time_interval(self.hass, self._tick, TICK)
+        return item
+
+    def unregister(self, entry_id):
+        item = self.entries.pop(entry_id, None)
+        if item in self.queue:
+            self.queue.remove(item)
+        if not self.entries and self._unsub:
+            self._unsub()
+            self._unsub = None
+
+    @callback
+    def _tick(self, *_):
+        now = time.monotonic()
+        for item in self.entries.values():
+            if item.queued is None and not item.running and item.due <= now:
+                item.queued = now
+                self.queue.append(item)
+        if not self.queue:
+            return
+        self.queue.sort(key=lambda x: (not x.priority, x.due))
+        for item in list(self.queue):
+            if not self.take(item.cost, item.priority):
+                # head of line blocking, cheaper entries behind must not starve an expensive one
+                break
+            self.queue.remove(item)
+            item.queued = None
+            item.running = True
+            self.hass.async_create_task(self._async_run(item))
+
+    async def _async_run(self, item: ScheduledEntry):
+        start = time.monotonic()
+        try:
+            await item.coordinator.async_refresh()
+        finally:
+            item.running = False
+            item.runs += 1
+            if item.last_run:
+                item.achieved = start - item.last_run
+            item.last_run = start
+            item.due = start + item.interval * random.uniform(0.9, 1.1)
+
+    def as_dict(self):
+        self.refill()
+        return {
+            'budget': self.budget,
+            'tokens': round(self.tokens, 2),
+            'queue_depth': len(self.queue),
+            'entries': len(self.entries),
+            'manual_requests': self.manual_requests,
+        }
@@ -3,26 +3,28 @@ from __future__ import annotations
 import logging
 
 from homeassistant.core import callback
+from homeassistant.helpers.restore_state import RestoreEntity
 from homeassistant.components.sensor import (
     DOMAIN as ENTITY_DOMAIN,
     SensorEntity as BaseEntity,
+    SensorStateClass,
 )
-from . import XEntity, Converter, StateCoordinator
+from homeassistant.helpers.entity import DeviceInfo
+from . import XEntity, Converter, StateCoordinator, DOMAIN, CONF_HUB
+from .aggregate import AggregateRegistry, HUB_UID
 
 _LOGGER = logging.getLogger(__name__)
 
 
 async def async_setup_entry(hass, entry, async_add_entities):
-    attrs = []
+    if entry.data.get(CONF_HUB):
+        hass.data[DOMAIN]['aggregates'].attach(async_add_entities)
+        return
     coordinator = hass.data[entry.entry_id]['coordinator']
-    for conv in coordinator.converters:
-        if conv.parent or conv.domain != ENTITY_DOMAIN:
-            continue
-        attrs.append(conv.attr)
-        async_add_entities([SensorEntity(coordinator, conv)])
+    attrs = coordinator.add_platform(ENTITY_DOMAIN, SensorEntity, async_add_entities)
     _LOGGER.info('async_setup_entry: %s', [ENTITY_DOMAIN, attrs])
 
-class SensorEntity(XEntity, BaseEntity):
+class SensorEntity(XEntity, BaseEntity, RestoreEntity):
     def __init__(self, coordinator: StateCoordinator, conv: Converter):
         super().__init__(coordinator, conv)
         self._attr_state_class = self._option.get('state_class')
@@ -37,3 +39,31 @@ class SensorEntity(XEntity, BaseEntity):
     def async_restore_last_state(self, state: str, attrs: dict):
         self._attr_native_value = attrs.get(self.attr, state)
         self._attr_extra_state_attributes.update(attrs)
+
+
+class AggregateSensorEntity(BaseEntity):
+    _attr_should_poll = False
+    _attr_icon = 'mdi:ev-station'
+    _attr_state_class = SensorStateClass.MEASUREMENT
+
+    def __init__(self, registry: AggregateRegistry, group: str):
+        self.registry = registry
+        self.group = group
+        self._attr_name = f'{group}空闲桩'
+        self._attr_unique_id = f'{DOMAIN}-aggregate-{group}'
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, HUB_UID)},
+            name='区域统计',
+        )
+
+    @property
+    def native_value(self):
+        return self.registry.groups.get(self.group, {}).get('total_left')
+
+    @property
+    def extra_state_attributes(self):
+        return dict(self.registry.groups.get(self.group) or {})
+
+    @property
+    def available(self):
+        return bool(self.registry.groups.get(self.group, {}).get('stations'))
@@ -0,0 +1,113 @@
+import re
+import time
+import logging
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+SAVE_DELAY = 30
+NGRAM = 2  # bigrams suit chinese station names better than trigrams
+MIN_SCORE = 0.5
+MAX_RESULTS = 20
+
+
+def ngrams(text: str, size=NGRAM):
+    text = ''.join(f'{text or ""}'.lower().split())
+    if len(text) <= size:
+        return {text} if text else set()
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+class StationIndex:
+    """Persistent n-gram index of every station the integration has fetched."""
+
+    def __init__(self, hass: HomeAssistant, domain: str):
+        self.hass = hass
+        self.store = Store(hass, STORAGE_VERSION, f'{domain}.station_index')
+        self.stations = {}
+        self.links = {}
+        self.grams = {}
+
+    async def async_load(self):
+        data = await self.store.async_load() or {}
+        self.links = data.get('links') or {}
+        for uid, info in (data.get('stations') or {}).items():
+            self._add(uid, info)
+        _LOGGER.debug('Loaded %s stations into index', len(self.stations))
+
+    def _data_to_save(self):
+        return {
+            'stations': self.stations,
+            'links': self.links,
+        }
+
+    def _add(self, uid, info):
+        if old := self.stations.get(uid):
+            for gram in self._station_grams(old):
+                self.grams.get(gram, set()).discard(uid)
+        self.stations[uid] = info
+        for gram in self._station_grams(info):
+            self.grams.setdefault(gram, set()).add(uid)
+
+    @staticmethod
+    def _station_grams(info):
+        return ngrams(info.get('name')) | ngrams(info.get('addr'))
+
+    def add(self, uid, name=None, addr=None):
+        if not uid:
+            return
+        old = self.stations.get(uid) or {}
+        info = {
+            'name': name or old.get('name', ''),
+            'addr': addr or old.get('addr', ''),
+        }
+        if info == {'name': old.get('name'), 'addr': old.get('addr')}:
+            return
+        self._add(uid, {**info, 'seen': int(time.time())})
+        self.store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    def add_link(self, url, location):
+        if not location or self.links.get(url) == location:
+            return
+        self.links[url] = location
+        self.store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    def search(self, query, limit=MAX_RESULTS):
+        """Return {uid: info} ordered by score, best first."""
+        query = f'{query or ""}'.strip().lower()
+        if not query:
+            return {}
+        if re.fullmatch(r'[0-9a-z]{6,}', query):
+            # full or partial poi uid
+            found = {
+                uid: info
+                for uid, info in self.stations.items()
+                if query in uid.lower()
+            }
+            if found:
+                return dict(list(found.items())[:limit])
+        grams = ngrams(query)
+        scores = {}
+        for gram in grams:
+            for uid in self.grams.get(gram, ()):
+                scores[uid] = scores.get(uid, 0) + 1
+        ranked = sorted(
+            ((cnt / len(grams), uid) for uid, cnt in scores.items()),
+            reverse=True,
+        )
+        return {
+            uid: self.stations[uid]
+            for score, uid in ranked[:limit]
+            if score >= MIN_SCORE
+        }
+
+
+async def async_get_index(hass: HomeAssistant, domain: str) -> StationIndex:
+    data = hass.data.setdefault(domain, {})
+    if not (index := data.get('index')):
+        index = data['index'] = StationIndex(hass, domain)
+        await index.async_load()
+    return index
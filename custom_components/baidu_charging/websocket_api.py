@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import voluptuous as vol
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.components import websocket_api
+
+from . import DOMAIN
+
+
+@callback
+def async_setup(hass: HomeAssistant):
+    websocket_api.async_register_command(hass, ws_subscribe)
+
+
+class SnapshotHub:
+    """Integration level snapshot subscribers keyed by station uid."""
+
+    def __init__(self):
+        self.coordinators = {}  # uid -> coordinator
+        self.snapshots = {}  # uid -> last snapshot sent, kept only while subscribed
+        self.subscribers = []  # (uids or None for all, send)
+
+    def _targets(self, uid):
+        return [send for uids, send in self.subscribers if not uids or uid in uids]
+
+    @callback
+    def add(self, coordinator):
+        """Register a set up or reloaded entry and send its fresh snapshot."""
+        uid = coordinator.poi_uid
+        self.coordinators[uid] = coordinator
+        self.snapshots.pop(uid, None)
+        if targets := self._targets(uid):
+            snapshot = self.snapshots[uid] = coordinator.station_snapshot()
+            for send in targets:
+                send({'snapshot': {uid: snapshot}})
+
+    @callback
+    def remove(self, coordinator):
+        uid = getattr(coordinator, 'poi_uid', None)
+        if not coordinator or self.coordinators.get(uid) is not coordinator:
+            return
+        self.coordinators.pop(uid, None)
+        self.snapshots.pop(uid, None)
+        for send in self._targets(uid):
+            send({'removed': [uid]})
+
+    @callback
+    def publish(self, coordinator):
+        """Send keys changed since the last snapshot of this station."""
+        uid = coordinator.poi_uid
+        if not (targets := self._targets(uid)):
+            self.snapshots.pop(uid, None)
+            return
+        old = self.snapshots.get(uid)
+        new = self.snapshots[uid] = coordinator.station_snapshot()
+        if old is None:
+            message = {'snapshot': {uid: new}}
+        else:
+            delta = {k: v for k, v in new.items() if k not in old or old[k] != v}
+            delta.update({k: None for k in old if k not in new})
+            if not delta:
+                return
+            message = {'delta': {uid: delta}}
+        for send in targets:
+            send(message)
+
+    @callback
+    def subscribe(self, uids, send):
+        """Return current snapshots of matching stations and stream later messages."""
+        snapshots = {}
+        for uid, coordinator in self.coordinators.items():
+            if uids and uid not in uids:
+                continue
+            if uid not in self.snapshots:
+                self.snapshots[uid] = coordinator.station_snapshot()
+            snapshots[uid] = self.snapshots[uid]
+        item = (set(uids or []), send)
+        self.subscribers.append(item)
+
+        @callback
+        def unsubscribe():
+            if item in self.subscribers:
+                self.subscribers.remove(item)
+        return snapshots, unsubscribe
+
+
+@websocket_api.websocket_command({
+    vol.Required('type'): f'{DOMAIN}/subscribe',
+    vol.Optional('uids'): [str],
+})
+@callback
+def ws_subscribe(hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: dict):
+    """Send a snapshot of each station, then stream changed keys only."""
+    msg_id = msg['id']
+
+    @callback
+    def send(message):
+        connection.send_message(websocket_api.event_message(msg_id, message))
+
+    hub: SnapshotHub = hass.data[DOMAIN]['snapshots']
+    snapshots, unsubscribe = hub.subscribe(msg.get('uids'), send)
+    connection.subscriptions[msg_id] = unsubscribe
+    connection.send_result(msg_id)
+    send({'snapshot': snapshots})